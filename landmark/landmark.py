@@ -1,43 +1,138 @@
+import atexit
+import contextlib
 import functools
 import re
-import time
 import unicodedata as ud
-from collections.abc import Callable, Iterable
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from typing import Literal
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import tqdm
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import InvalidArgumentException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import InvalidArgumentException, NoSuchElementException, TimeoutException
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    '''正規表現をコンパイルし、パターン文字列ごとにキャッシュする。'''
+    return re.compile(pattern)
+
+# NFKC正規化の結果をキャッシュする文字列の最大長(繰り返し現れる短いラベルのみを対象とし、長いページテキストは保持しない)。
+_NFKC_CACHE_MAX_LEN = 256
+
+@functools.lru_cache(maxsize=4096)
+def _nfkc(text: str) -> str:
+    '''文字列をNFKC正規化し、結果をキャッシュする。'''
+    return ud.normalize('NFKC', text)
+
+def _normalize(text: str) -> str:
+    '''文字列をNFKC正規化する。ASCII文字のみの文字列は正規化しても変わらないため、そのまま返す。'''
+    if text.isascii():
+        return text
+    return _nfkc(text) if len(text) <= _NFKC_CACHE_MAX_LEN else ud.normalize('NFKC', text)
+
+# get_attributeと同様に、プロパティ値を優先し、無ければ属性値を返すJavaScript関数。
+# hrefとsrcは、get_attributeと同様に属性自体が無い場合はnullを返す(プロパティは属性が無くても''となるため)。
+_JS_GET_ATTR = '''const getAttr = (e, name) => {
+    if (!e) return null;
+    if ((name === 'href' || name === 'src') && !e.hasAttribute(name)) return null;
+    const v = e[name];
+    if (typeof v === 'boolean') return v ? 'true' : null;
+    if (typeof v === 'string' || typeof v === 'number') return String(v);
+    return e.getAttribute(name);
+};'''
+
+# save_rowで、バッファに溜めた行をparquetファイルへ追記する行数(1回の追記が1つの行グループになる)。
+_ROWS_PER_WRITE = 1000
 
 class Landmark:
     '''ブラウザを自動操作するツール。
 
+    Note:
+        cache_selectors=Trueを渡すと、ssの取得結果がDOMが変わり得る操作を行うまでキャッシュされる。\n
+        キャッシュはフレームやタブを区別しないため、Landmarkを介さずにフレームやタブを切り替えた場合(driver.switch_toを直接使う場合など)は、invalidate_sel_cacheを呼ぶ必要がある。\n
+        blocked_urlsを渡すと、Chrome DevTools Protocolを使い、URLがそのパターン(*をワイルドカードとして使用可)に一致するリソースの読み込みを止める(Chromium系のWebDriverのみ)。\n
+        この設定はタブごとに有効となるため、Landmarkが開いたり切り替えたりしたタブ(crawlの先読みタブやclickで開かれたタブ)にはその都度設定し直す。
+
     Attributes:
         _driver:
             WebDriverのインスタンス。
+        _blocked_urls:
+            読み込みを止めるリソースのURLのパターンのリスト。
         _tables:
-            辞書。キーはテーブルデータの保存名。値はスクレイピング結果の辞書を格納したリスト。
+            辞書。キーはテーブルデータの保存名。値はparquetファイルへ未書き込みのスクレイピング結果の辞書を格納したリスト。
+        _writers:
+            辞書。キーはテーブルデータの保存名。値はparquetファイルへ追記するParquetWriter。
+        _closed_tables:
+            closeで閉じたparquetファイルのテーブルデータの保存名の集合。
+        _cache_selectors:
+            ssの取得結果をキャッシュするかどうか。
+        _sel_cache:
+            辞書。キーはセレクタと取得元Web要素のIDのタプル(DOM全体からの場合はNone)。値は取得したWeb要素のリスト。
     '''
-    def __init__(self, driver: WebDriver) -> None:
+    def __init__(self, driver: WebDriver, cache_selectors: bool = False, blocked_urls: list[str] | None = None) -> None:
         self._driver = driver
+        self._blocked_urls = blocked_urls
+        self._block_urls()
         self._tables: dict[str, list[dict[str, str]]] = {}
+        self._writers: dict[str, pq.ParquetWriter] = {}
+        self._closed_tables: set[str] = set()
+        self._cache_selectors = cache_selectors
+        self._sel_cache: dict[tuple[str, str | None], list[WebElement]] = {}
+
+    def _block_urls(self) -> None:
+        '''現在のタブで、blocked_urlsに一致するリソースの読み込みを止める。'''
+        if self._blocked_urls:
+            self._driver.execute_cdp_cmd('Network.enable', {})
+            self._driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self._blocked_urls})
+
+    def __enter__(self) -> 'Landmark':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     def ss(self, selector: str, from_: Literal['driver'] | WebElement | None = 'driver') -> list[WebElement]:
-        '''セレクタを使用し、DOM(全体かサブセット)からWeb要素をリストで取得。'''
-        if from_ == 'driver':
-            return self._driver.find_elements(By.CSS_SELECTOR, selector)
-        return [] if from_ is None else from_.find_elements(By.CSS_SELECTOR, selector)
+        '''セレクタを使用し、DOM(全体かサブセット)からWeb要素をリストで取得。
+
+        Note:
+            cache_selectors=Trueの場合、取得結果はページ遷移やクリックなど、DOMが変わり得る操作を行うまでキャッシュされる。\n
+            Landmarkを介さずにフレームやタブを切り替えた場合は、invalidate_sel_cacheを呼ぶ必要がある。
+        '''
+        if from_ is None:
+            return []
+        root = self._driver if isinstance(from_, str) else from_
+        if not self._cache_selectors:
+            return root.find_elements(By.CSS_SELECTOR, selector)
+        key = (selector, from_.id if root is from_ else None)
+        if key not in self._sel_cache:
+            self._sel_cache[key] = root.find_elements(By.CSS_SELECTOR, selector)
+        return list(self._sel_cache[key])
+
+    def invalidate_sel_cache(self) -> None:
+        '''ssの取得結果のキャッシュを破棄する(cache_selectors=Trueの場合に、DOMを書き換える処理を行った後などに使う)。'''
+        self._sel_cache.clear()
 
     def s(self, selector: str, from_: Literal['driver'] | WebElement | None = 'driver') -> WebElement | None:
         '''セレクタを使用し、DOM(全体かサブセット)からWeb要素を取得。'''
-        return elems[0] if (elems := self.ss(selector, from_)) else None
+        if from_ is None:
+            return None
+        if self._cache_selectors:
+            return elems[0] if (elems := self.ss(selector, from_)) else None
+        try:
+            return (self._driver if isinstance(from_, str) else from_).find_element(By.CSS_SELECTOR, selector)
+        except NoSuchElementException:
+            return None
 
     def re_filter(self, pattern: str, elems: list[WebElement]) -> list[WebElement]:
         '''Web要素のtextContent属性値をNFKC正規化し、正規表現でフィルターにかける。'''
-        return [elem for elem in elems if re.findall(pattern, ud.normalize('NFKC', self.attr('textContent', elem)))]
+        rx = _compile(pattern)
+        return [elem for elem, text in zip(elems, self.attrs('textContent', elems)) if text is not None and rx.search(_normalize(text))]
 
     def ss_re(self, selector: str, pattern: str, from_: Literal['driver'] | WebElement | None = 'driver') -> list[WebElement]:
         '''セレクタと正規表現を使用し、DOM(全体かサブセット)からWeb要素をリストで取得。'''
@@ -49,9 +144,22 @@ class Landmark:
 
     def attr(self, attr_name: Literal['textContent', 'innerText', 'href', 'src'] | str, elem: WebElement | None) -> str | None:
         '''Web要素から任意の属性値を取得。'''
-        if elem:
-            return attr.strip() if (attr := elem.get_attribute(attr_name)) else attr
-        return None
+        return self.attrs(attr_name, [elem])[0] if elem else None
+
+    def attrs(self, attr_name: Literal['textContent', 'innerText', 'href', 'src'] | str, elems: list[WebElement | None]) -> list[str | None]:
+        '''Web要素のリストから任意の属性値をまとめて取得(JavaScriptの実行は1回のみ)。'''
+        if not elems:
+            return []
+        values = self._driver.execute_script(_JS_GET_ATTR + 'return arguments[1].map(e => getAttr(e, arguments[0]));', attr_name, elems)
+        return [value.strip() if value else value for value in values]
+
+    def ss_attr(self, selector: str, attr_name: Literal['textContent', 'innerText', 'href', 'src'] | str, from_: Literal['driver'] | WebElement | None = 'driver') -> list[str | None]:
+        '''セレクタを使用し、DOM(全体かサブセット)から取得したWeb要素の属性値をリストで取得(JavaScriptの実行は1回のみ)。'''
+        if from_ is None:
+            return []
+        root = None if isinstance(from_, str) else from_
+        values = self._driver.execute_script(_JS_GET_ATTR + 'return [...(arguments[2] || document).querySelectorAll(arguments[0])].map(e => getAttr(e, arguments[1]));', selector, attr_name, root)
+        return [value.strip() if value else value for value in values]
 
     def parent(self, elem: WebElement | None) -> WebElement | None:
         '''渡されたWeb要素の親要素を取得。'''
@@ -65,57 +173,123 @@ class Landmark:
         '''渡されたWeb要素の弟要素を取得。'''
         return self._driver.execute_script('return arguments[0].nextElementSibling;', elem) if elem else None
 
-    def landmark(self, elems: list[WebElement], class_name: str) -> None:
+    def parents(self, elems: list[WebElement | None]) -> list[WebElement | None]:
+        '''渡されたWeb要素のリストの各親要素をまとめて取得。'''
+        return self._driver.execute_script('return arguments[0].map(e => e && e.parentElement);', elems) if elems else []
+
+    def prev_sibs(self, elems: list[WebElement | None]) -> list[WebElement | None]:
+        '''渡されたWeb要素のリストの各兄要素をまとめて取得。'''
+        return self._driver.execute_script('return arguments[0].map(e => e && e.previousElementSibling);', elems) if elems else []
+
+    def next_sibs(self, elems: list[WebElement | None]) -> list[WebElement | None]:
+        '''渡されたWeb要素のリストの各弟要素をまとめて取得。'''
+        return self._driver.execute_script('return arguments[0].map(e => e && e.nextElementSibling);', elems) if elems else []
+
+    def traverse(self, elem: WebElement | None, steps: str) -> WebElement | None:
+        '''渡されたWeb要素から、steps(.区切り)の順に親要素・兄要素・弟要素を辿った先の要素を取得(JavaScriptの実行は1回のみ)。
+
+        Note:
+            stepsに使えるのは、p(親要素)、s-(兄要素)、s+(弟要素)の3つ。例: 'p.p.s-'は親の親の兄要素。
+        '''
+        if (invalid := [step for step in steps.split('.') if step not in ('p', 's-', 's+')]):
+            raise ValueError(f'Invalid steps: {invalid}')
+        if not elem:
+            return None
+        return self._driver.execute_script('''let e = arguments[0];
+            for (const step of arguments[1]) {
+                if (!e) break;
+                e = step === 'p' ? e.parentElement : step === 's-' ? e.previousElementSibling : e.nextElementSibling;
+            }
+            return e;''', elem, steps.split('.'))
+
+    def landmark(self, elems: list[WebElement] | str, class_name: str) -> None:
         '''Web要素に任意のクラスを追加する。
 
         Note:
-            このメソッドを利用することにより、Web要素のあらゆる取得条件をセレクタで表現できるようになる。
+            このメソッドを利用することにより、Web要素のあらゆる取得条件をセレクタで表現できるようになる。\n
+            elemsにセレクタを渡すと、要素の取得とクラスの追加をブラウザ内で行う(Web要素をPython側に取得しない)。
         '''
-        for elem in elems:
-            self._driver.execute_script(f'arguments[0].classList.add("{class_name}");', elem)
+        if isinstance(elems, str):
+            self._driver.execute_script('for (const e of document.querySelectorAll(arguments[0])) e.classList.add(arguments[1]);', elems, class_name)
+        elif elems:
+            self._driver.execute_script('for (const e of arguments[0]) e.classList.add(arguments[1]);', elems, class_name)
+        else:
+            return
+        self.invalidate_sel_cache()
 
     def go_to(self, url: str) -> None:
-        '''指定したURLに遷移。'''
+        '''指定したURLに遷移。
+
+        Note:
+            pageLoadStrategyがnormal以外の場合はdriver.getが読み込み完了前に戻るため、遷移前のページが破棄されるのを待ってから読み込み完了を待つ。
+        '''
+        self.invalidate_sel_cache()
+        old_html = None if self._driver.capabilities.get('pageLoadStrategy', 'normal') == 'normal' else self._driver.find_element(By.TAG_NAME, 'html')
         try:
             self._driver.get(url)
+            if old_html:
+                WebDriverWait(self._driver, 10, poll_frequency=0.1).until(EC.staleness_of(old_html))
         except (InvalidArgumentException, TimeoutException) as e:
             print(f'{type(e).__name__}: {e}')
         else:
-            time.sleep(1)
+            self._wait_ready()
 
     def click(self, elem: WebElement, tab_switch: bool = True) -> None:
         '''指定したWeb要素をクリック(JavaScriptを使用し、要素のclickイベントを発生させる)。
 
         Note:
-            クリック時に新しいタブが開かれた場合は、そのタブに遷移(tab_switch=Falseで無効化)。
+            クリック時に新しいタブが開かれた場合は、そのタブに遷移(tab_switch=Falseで無効化)。\n
+            ページ遷移か新しいタブの表示を最大1秒待ち、その後ページの読み込み完了を待つ。
         '''
         if elem:
+            html = self._driver.find_element(By.TAG_NAME, 'html')
+            handles = self._driver.window_handles
             self._driver.execute_script('arguments[0].click();', elem)
-            time.sleep(1)
-            if tab_switch and len(self._driver.window_handles) == 2:
+            try:
+                WebDriverWait(self._driver, 1, poll_frequency=0.1).until(EC.any_of(EC.staleness_of(html), EC.number_of_windows_to_be(len(handles) + 1)))
+            except TimeoutException:
+                pass
+            if tab_switch and (new_handles := [handle for handle in self._driver.window_handles if handle not in handles]):
                 self._driver.close()
-                self._driver.switch_to.window(self._driver.window_handles[-1])
+                self._driver.switch_to.window(new_handles[0])
+                self._block_urls()
+            self._wait_ready()
+            self.invalidate_sel_cache()
+
+    def _wait_ready(self, timeout: float = 10) -> None:
+        '''ページの読み込みが完了する(document.readyStateがcompleteになる)まで待機。タイムアウトした場合はそのまま処理を続ける。'''
+        try:
+            WebDriverWait(self._driver, timeout, poll_frequency=0.1).until(lambda driver: driver.execute_script('return document.readyState;') == 'complete')
+        except TimeoutException:
+            pass
 
     def switch_to(self, iframe_elem: WebElement) -> None:
-        '''指定したiframeの中に制御を移す。'''
+        '''指定したiframeの中に制御を移し、iframe内のページの読み込み完了を待つ。'''
         self.scroll_to_view(iframe_elem)
         if iframe_elem:
             self._driver.switch_to.frame(iframe_elem)
+            self._wait_ready()
+            self.invalidate_sel_cache()
+
+    def switch_to_default(self) -> None:
+        '''iframeの中から、ページ全体(最上位のフレーム)に制御を戻す。'''
+        self._driver.switch_to.default_content()
+        self.invalidate_sel_cache()
 
     def scroll_to_view(self, elem: WebElement | None) -> None:
         '''スクロールして、指定Web要素を表示する。'''
         if elem:
             self._driver.execute_script('arguments[0].scrollIntoView({behavior: "instant", block: "end", inline: "nearest"});', elem)
-            time.sleep(1)
+            self.invalidate_sel_cache()
 
     def next_hrefs1(self, select_next_button: Callable[[], WebElement], by_click: bool = False) -> list[str]:
         '''nextボタン要素を特定し、そのhrefを開きながら(by_click=Trueならばクリックしながら)取得していく。'''
-        hrefs = [self.driver.current_url]
+        hrefs = [self._driver.current_url]
         while True:
             next_ = select_next_button() if by_click else self.attr('href', select_next_button())
             if next_:
                 self.click(next_) if by_click else self.go_to(next_)
-                hrefs.append(self.driver.current_url)
+                hrefs.append(self._driver.current_url)
             else:
                 break
         return hrefs
@@ -129,10 +303,10 @@ class Landmark:
             2.次からボタンが二つ。←二つ目がnext。\n
             3.最後にまたボタンが一つに。←それはprevだからnextは無し。
         '''
-        hrefs = [self.driver.current_url]
+        hrefs = [self._driver.current_url]
         first_page = True
         while True:
-            prev_and_next = select_prev_and_next_button() if by_click else [self.attr('href', elem) for elem in select_prev_and_next_button()]
+            prev_and_next = select_prev_and_next_button() if by_click else self.attrs('href', select_prev_and_next_button())
             match len(prev_and_next):
                 case 0:
                     break
@@ -145,28 +319,145 @@ class Landmark:
                 case 2:
                     next_ = prev_and_next[1]
             self.click(next_) if by_click else self.go_to(next_)
-            hrefs.append(self.driver.current_url)
+            hrefs.append(self._driver.current_url)
         return hrefs
 
     def save_row(self, name_path: str, row: dict[str, str]) -> None:
-        '''指定した名前のテーブルデータ(無い場合は作成される)に行を追加。行は列名と値が要素の辞書。テーブルデータはparquetファイルとして保存される。'''
+        '''指定した名前のテーブルデータ(無い場合は作成される)に行を追加。行は列名と値が要素の辞書。テーブルデータはparquetファイルとして保存される。
+
+        Note:
+            行はバッファに溜められ、一定数ごとにparquetファイルへ追記される(残りの行はclose時に書き出される)。\n
+            parquetファイルはclose(with文を抜けた時かプログラム終了時)までは読み込めない状態となる。\n
+            close後に同じ名前のテーブルデータに行を追加すると、書き出し済みの行を読み込み直した上で引き続き追記する。\n
+            列は最初の書き出し時点のバッファ内の全ての行の列名で確定し、それ以降に新しい列名を持つ行を書き出すとValueErrorとなる。
+        '''
+        if not self._tables:
+            atexit.register(self.close)
         if name_path not in self._tables.keys():
             self._tables[name_path] = []
         self._tables[name_path].append(row)
-        pd.DataFrame(self._tables[name_path]).to_parquet(f'{name_path}.parquet')
+        if len(self._tables[name_path]) >= _ROWS_PER_WRITE:
+            self._write_rows(name_path)
+
+    def _write_rows(self, name_path: str) -> None:
+        '''バッファに溜まった行を、指定した名前のテーブルデータのparquetファイルへ追記する。'''
+        if not (rows := self._tables[name_path]):
+            return
+        if name_path in self._writers:
+            writer = self._writers[name_path]
+            if (unknown := list(dict.fromkeys(key for row in rows for key in row if key not in writer.schema.names))):
+                raise ValueError(f'Columns {unknown} are not in the schema of {name_path}.parquet: {writer.schema.names}')
+            batch = pa.RecordBatch.from_pylist(rows, schema=writer.schema)
+        else:
+            if name_path in self._closed_tables:
+                rows[:0] = pq.read_table(f'{name_path}.parquet').to_pylist()
+                self._closed_tables.discard(name_path)
+            keys = list(dict.fromkeys(key for row in rows for key in row))
+            batch = pa.RecordBatch.from_pylist([{key: row.get(key) for key in keys} for row in rows])
+            batch = batch.cast(pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in batch.schema]))
+            writer = self._writers[name_path] = pq.ParquetWriter(f'{name_path}.parquet', batch.schema)
+        writer.write_batch(batch)
+        rows.clear()
+
+    def close(self) -> None:
+        '''バッファに残った行を書き出し、全てのparquetファイルを閉じる。
+
+        Note:
+            書き出しに失敗したテーブルデータがあっても、他のテーブルデータの書き出しと全てのparquetファイルのクローズは行い、最初のエラーを送出する。\n
+            失敗したテーブルデータの行はバッファに残り、次のclose時(プログラム終了時を含む)に、書き出し済みの行を読み込み直した上で再度書き出される。
+        '''
+        errors = []
+        for name_path in self._tables.keys():
+            try:
+                self._write_rows(name_path)
+            except Exception as e:
+                errors.append(e)
+        for writer in self._writers.values():
+            writer.close()
+        self._closed_tables.update(self._writers.keys())
+        self._writers.clear()
+        self._tables = {name_path: rows for name_path, rows in self._tables.items() if rows}
+        if not self._tables:
+            atexit.unregister(self.close)
+        if errors:
+            raise errors[0]
 
     def use_tqdm(self, items: Iterable, target_func: Callable) -> tqdm:
         '''繰り返し処理を行う関数の進捗状況を表示する。'''
-        return tqdm.tqdm(items, desc=f'{target_func.__name__}', bar_format='{desc}  {percentage:3.0f}%  {elapsed}  {remaining}')
+        return tqdm.tqdm(items, desc=f'{target_func.__name__}', bar_format='{desc}  {percentage:3.0f}%  {elapsed}  {remaining}', mininterval=0.5)
+
+    def _open_pages(self, page_urls: Iterable[str], target_func: Callable, tabs: int = 1) -> Iterator[None]:
+        '''page_urlsの各ページを順番に開き、開くたびに制御を返す。
+
+        Note:
+            tabsが2以上の場合は、その数のタブで後続のページを先に読み込ませておき、読み込みの待ち時間を重ねる。\n
+            制御が戻った時点で表示されているタブは、次のページの読み込みに再利用される。\n
+            不正なURL(Noneなど)や、ページ読み込みのタイムアウト(WebDriverのpage_load)までに遷移しなかったページは、メッセージを表示して飛ばす。\n
+            終了時(例外発生時を含む)には、開いたタブを閉じて元のタブ(閉じられていた場合は最後に表示していたタブ)に戻る。
+        '''
+        if tabs < 2:
+            for page_url in self.use_tqdm(page_urls, target_func):
+                self.go_to(page_url)
+                yield
+            return
+        progress = self.use_tqdm(page_urls, target_func)
+        page_urls = iter(page_urls)
+        origin = self._driver.current_window_handle
+        before = set(self._driver.window_handles)
+        loading: deque[tuple[str, str, WebElement]] = deque()
+        end = object()
+        def load(handle: str) -> None:
+            self._driver.switch_to.window(handle)
+            while (page_url := next(page_urls, end)) is not end:
+                if isinstance(page_url, str) and page_url:
+                    loading.append((handle, page_url, self._driver.find_element(By.TAG_NAME, 'html')))
+                    self._driver.execute_script('window.location.href = arguments[0];', page_url)
+                    return
+                print(f'InvalidArgumentException: invalid URL: {page_url!r}')
+                progress.update()
+        try:
+            load(origin)
+            for _ in range(tabs - 1):
+                self._driver.switch_to.new_window('tab')
+                self._block_urls()
+                load(self._driver.current_window_handle)
+            while loading:
+                handle, page_url, old_html = loading.popleft()
+                self._driver.switch_to.window(handle)
+                try:
+                    WebDriverWait(self._driver, self._driver.timeouts.page_load, poll_frequency=0.1).until(EC.staleness_of(old_html))
+                except TimeoutException:
+                    print(f'TimeoutException: page load timed out: {page_url}')
+                else:
+                    self._wait_ready()
+                    self.invalidate_sel_cache()
+                    yield
+                progress.update()
+                load(self._driver.current_window_handle)
+        finally:
+            progress.close()
+            handles = self._driver.window_handles
+            keep = origin if origin in handles else self._driver.current_window_handle
+            for handle in handles:
+                if handle not in before and handle != keep:
+                    self._driver.switch_to.window(handle)
+                    self._driver.close()
+            self._driver.switch_to.window(keep)
+            self.invalidate_sel_cache()
+
+    def crawl(self, proc_page: Callable[[], Iterable[str] | None]) -> Callable[..., list[str]]:
+        '''page_urlsの各ページに対し、proc_pageが実行されるようになる。さらにproc_pageがhrefsを返す場合、それら全てを結合したリストを返すようになる。
 
-    def crawl(self, proc_page: Callable[[], Iterable[str] | None]) -> Callable[[list[str]], list[str]]:
-        '''page_urlsの各ページに対し、proc_pageが実行されるようになる。さらにproc_pageがhrefsを返す場合、それら全てを結合したリストを返すようになる。'''
+        Note:
+            tabsに2以上を渡すと、その数のタブで後続のページを先読みしながら処理する(proc_pageは常に1ページずつ順番に実行される)。\n
+            先読みの効果を得るには、WebDriverのpageLoadStrategyを'none'にする必要がある。既定の'normal'では、ChromeDriverが次のコマンドの前に未完了のページ遷移を待つことがあり、読み込みが順番に行われて速くならない。
+        '''
         @functools.wraps(proc_page)
-        def wrapper(page_urls: list[str]) -> list[str]:
+        def wrapper(page_urls: Iterable[str], tabs: int = 1) -> list[str]:
             urls = []
-            for page_url in self.use_tqdm(page_urls, proc_page):
-                self.go_to(page_url)
-                if isinstance(hrefs := proc_page(), Iterable):
-                    urls.extend(hrefs)
+            with contextlib.closing(self._open_pages(page_urls, proc_page, tabs)) as pages:
+                for _ in pages:
+                    if isinstance(hrefs := proc_page(), Iterable):
+                        urls.extend(hrefs)
             return urls
         return wrapper